@@ -0,0 +1,41 @@
+/* Benchmark the lib/exec.js string helpers inside of the Gnome Shell.
+ *
+ * Run via:
+ *    python3 shell-exec.py lib/bench-exec.js
+ *
+ * Configuration options:
+ *
+ * size
+ *    number: length of the generated inputs (default 65536)
+ * iterations
+ *    number: number of calls to time per helper (default 100)
+ */
+
+(function() {
+  const size = CONF.size || 65536;
+  const iterations = CONF.iterations || 100;
+  const printable = "x".repeat(size);
+  let mixed = "";
+  for (let i = 0; i < size; ++i) {
+    mixed += String.fromCharCode(i % 0x100);
+  }
+  let bytes = new Uint8Array(size);
+  for (let i = 0; i < size; ++i) {
+    bytes[i] = i % 0x100;
+  }
+  const cases = [
+    ["_escape(printable)", _escape, [printable]],
+    ["_escape(mixed)", _escape, [mixed]],
+    ["_bytesToString(bytes)", _bytesToString, [bytes]],
+    ["_bytesToString(bytes, \"utf-8\")", _bytesToString, [bytes.map((b) => b & 0x7f), "utf-8"]]
+  ];
+  let lines = [`size=${size} iterations=${iterations}`];
+  for (let [name, func, args] of cases) {
+    try {
+      lines.push(`${name}: ${_bench(func, args, iterations).toFixed(3)} ms/call`);
+    } catch (e) {
+      lines.push(`${name}: skipped (${e})`);
+    }
+  }
+  return lines.join("\n");
+})();
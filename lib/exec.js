@@ -46,38 +46,47 @@ function _write_file(fpath, data) {
   ostream.close(null);
 }
 
+/* Characters that _escape must replace, and their special escapes */
+const _ESCAPE_RE = /[\x00-\x1f\x80-\uffff]/g;
+const _ESCAPE_CHARS = {"\r": "\\r", "\n": "\\n", "\v": "\\v", "\t": "\\t", "\0": "\\0"};
+
+/* Number of bytes _bytesToString passes to String.fromCharCode at once */
+const _BYTES_CHUNK = 8192;
+
 /* Escape a string for printing */
 function _escape(s) {
-  let r = "";
-  for (let i = 0; i < s.length; ++i) {
-    let c = s[i].charCodeAt(0);
-    if (s[i] === '\r') {
-      r += "\\r";
-    } else if (s[i] === "\n") {
-      r += "\\n";
-    } else if (s[i] === "\v") {
-      r += "\\v";
-    } else if (s[i] === "\t") {
-      r += "\\t";
-    } else if (c === 0) {
-      r += '\\0';
-    } else if (c < 0x20 || c > 0x7f) {
-      r += "\\x" + (c).toString(16).padStart(2, "0");
-    } else {
-      r += String.fromCharCode(c);
-    }
+  if (s.search(_ESCAPE_RE) === -1) {
+    return s;
   }
-  return r;
+  return s.replace(_ESCAPE_RE, (ch) => _ESCAPE_CHARS[ch] ||
+    "\\x" + ch.charCodeAt(0).toString(16).padStart(2, "0"));
 }
 
-/* Convert a byte array to a string */
-function _bytesToString(ba) {
+/* Convert a byte array to a string; each byte becomes one character unless
+ * an encoding (such as "utf-8") is given */
+function _bytesToString(ba, encoding=null) {
   let barray = (ba instanceof imports.gi.GLib.Bytes ? ba.toArray() : ba);
-  let chrs = [];
-  for (let b of barray) {
-    chrs.push(String.fromCharCode(b));
+  if (encoding !== null) {
+    return imports.byteArray.toString(Uint8Array.from(barray), encoding);
+  }
+  let chunks = [];
+  for (let i = 0; i < barray.length; i += _BYTES_CHUNK) {
+    const chunk = barray.subarray ?
+      barray.subarray(i, i + _BYTES_CHUNK) :
+      barray.slice(i, i + _BYTES_CHUNK);
+    chunks.push(String.fromCharCode.apply(null, chunk));
   }
-  return chrs.join("");
+  return chunks.join("");
+}
+
+/* Time a function; returns the average number of milliseconds per call */
+function _bench(func, args=[], iterations=100) {
+  const GLib = imports.gi.GLib;
+  const start = GLib.get_monotonic_time();
+  for (let i = 0; i < iterations; ++i) {
+    func.apply(null, args);
+  }
+  return (GLib.get_monotonic_time() - start) / 1000 / iterations;
 }
 
 /* Print a message to the invoking tty */
@@ -183,6 +192,54 @@ function _get_members(obj) {
   }
 }
 
+/* Compute the SHA1 hex digest of a string's UTF-16 code units; unlike
+ * compute_checksum_for_string, this preserves embedded NULs and lone
+ * surrogates */
+function _hash_string(s) {
+  const GLib = imports.gi.GLib;
+  let data = new Uint8Array(s.length * 2);
+  for (let i = 0; i < s.length; ++i) {
+    const c = s.charCodeAt(i);
+    data[2 * i] = c & 0xff;
+    data[2 * i + 1] = c >> 8;
+  }
+  return GLib.compute_checksum_for_data(GLib.ChecksumType.SHA1, data);
+}
+
+/* Capture an object's members; returns mappings of name to _inspect_value
+ * and of name to _hash_string of that value */
+function _snapshot_members(obj) {
+  let result = {members: Object.create(null), hashes: Object.create(null)};
+  for (let i of _list_object(obj)) {
+    const value = _inspect_value(obj, i);
+    result.members[i] = value;
+    result.hashes[i] = _hash_string(value);
+  }
+  return result;
+}
+
+/* Compare an object's members against a mapping of name to hash; returns
+ * only the members that were added, removed, or changed */
+function _diff_members(obj, hashes) {
+  let result = {added: Object.create(null), removed: [], changed: Object.create(null)};
+  let seen = new Set();
+  for (let i of _list_object(obj)) {
+    const value = _inspect_value(obj, i);
+    seen.add(i);
+    if (!Object.prototype.hasOwnProperty.call(hashes, i)) {
+      result.added[i] = value;
+    } else if (hashes[i] !== _hash_string(value)) {
+      result.changed[i] = value;
+    }
+  }
+  for (let i of Object.keys(hashes)) {
+    if (!seen.has(i)) {
+      result.removed.push(i);
+    }
+  }
+  return result;
+}
+
 /* Recursively inspect an object
 function _inspect(obj, name=null, depth=0, maxdepth=null, seen=null, exclude=null) {
   let results = [];
@@ -9,6 +9,8 @@ There are several primary modes of execution:
     3) Inspecting an expression directly with -i,--inspect-expr
     4) Printing an expression with -p,--print-expr
     5) Listing an expression's attributes with -l,--list-expr
+    6) Saving an expression's members with -s,--snapshot
+    7) Comparing an expression's members to a snapshot with -d,--diff
 
 If the LIBEXEC_SCRIPT script exists, then it is executed before the requested
 script(s). This defaults to "lib/exec.js". You can override this by changing
@@ -25,6 +27,14 @@ literal. Anything that can be parsed via ast.literal_eval can be used. For
 example, to set the key "list" to the array [1, 2, 'foo'], use:
     -c "list:=[1,2,'foo']"
 
+Snapshots (-s NAME) store the members of the -e expression, as described by
+_inspect_value, to NAME.json in SNAPSHOT_DIR. This defaults to
+"~/.cache/shell-exec" and can be overridden with the SNAPSHOT_DIR environment
+variable. Member hashes are computed shell-side and stored alongside the
+members. Diffing (-d NAME) sends only the stored hashes back to the shell;
+the shell reports the members that were added, removed, or changed. If -e is
+omitted, then -d uses the expression stored in the snapshot.
+
 If using -e and inspecting imports.ui.main.panel and you get either of the
 following linker errors,
     undefined symbol: clutter_actor_pop_internal
@@ -53,6 +63,8 @@ BUS_OBJ = 'org.gnome.Shell'
 BUS_PATH = '/org/gnome/Shell'
 
 LIBEXEC_SCRIPT = os.environ.get("LIBEXEC_SCRIPT", "lib/exec.js")
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR",
+        os.path.expanduser(os.path.join("~", ".cache", "shell-exec")))
 
 def _jscall(expr, **kwargs):
     js = r"(function() { return <EXPR>; })();".replace("<EXPR>", expr)
@@ -113,6 +125,80 @@ def get_run_script(expr):
     "Create a script that just runs the expression"
     return _jscall(r"<EXPR>", EXPR=expr)
 
+def get_snapshot_script(expr):
+    """Create a script that returns the members of the expression. Requires
+    libexec script."""
+    return _jscall(r"_snapshot_members(<EXPR>)", EXPR=expr)
+
+def get_diff_script(expr, hashes):
+    """Create a script that compares the members of the expression against
+    the given member hashes. Requires libexec script."""
+    # Pass the hashes through JSON.parse so a member named __proto__ remains
+    # an ordinary property
+    return _jscall(r"_diff_members(<EXPR>, JSON.parse(<H>))", EXPR=expr,
+            H=json.dumps(json.dumps(hashes)))
+
+def _snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, "{}.json".format(name))
+
+def save_snapshot(name, expr, members, hashes):
+    "Write the members of the expression and their hashes to the named snapshot"
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(_snapshot_path(name), "wt") as fobj:
+        json.dump({"expr": expr, "members": members, "hashes": hashes}, fobj,
+                separators=(",", ":"), sort_keys=True)
+
+def load_snapshot(name):
+    "Read the named snapshot"
+    with open(_snapshot_path(name), "rt") as fobj:
+        return json.load(fobj)
+
+def format_diff(expr, members, delta):
+    "Format the delta returned by _diff_members as a list of lines"
+    lines = []
+    for key in sorted(delta["added"]):
+        lines.append("+ {}: {}".format(key, delta["added"][key]))
+    for key in sorted(delta["removed"]):
+        lines.append("- {}: {}".format(key, members[key]))
+    for key in sorted(delta["changed"]):
+        lines.append("~ {}: {} -> {}".format(key, members[key], delta["changed"][key]))
+    if len(lines) == 0:
+        lines.append("(no changes)")
+    return ["{}:".format(expr)] + ["  " + line for line in lines]
+
+def run_snapshot(proxy, name, expr, config=None, quiet=False):
+    "Capture the members of the expression and store them as a snapshot"
+    success, response = run_script(proxy, get_snapshot_script(expr), config)
+    if not success:
+        logger.error("Error running script!")
+        print(response)
+        return False
+    snapshot = json.loads(response)
+    save_snapshot(name, expr, snapshot["members"], snapshot["hashes"])
+    if not quiet:
+        logger.info("Saved {} members of {} to {}".format(
+            len(snapshot["members"]), expr, _snapshot_path(name)))
+    return True
+
+def run_diff(proxy, name, expr=None, config=None, quiet=False):
+    """Compare the members of the expression against a snapshot. Only the
+    member hashes are sent to the shell and only the differences are sent
+    back. If expr is None, then the snapshot's expression is used."""
+    snapshot = load_snapshot(name)
+    if expr is None:
+        expr = snapshot["expr"]
+    members = snapshot["members"]
+    script = get_diff_script(expr, snapshot["hashes"])
+    success, response = run_script(proxy, script, config)
+    if not success:
+        logger.error("Error running script!")
+        print(response)
+        return False
+    delta = json.loads(response)
+    if not quiet:
+        print("\n".join(format_diff(expr, members, delta)))
+    return True
+
 def main():
     ap = argparse.ArgumentParser(epilog="""
 Configuration options are set by calling _merge_conf before executing the
@@ -132,6 +218,10 @@ lib/exec.js. See this module's docstring for an explanation of this syntax""")
         help="list members of an expression")
     ap.add_argument("-r", "--run-expr", metavar="EXPR",
         help="run an expression")
+    ap.add_argument("-s", "--snapshot", metavar="NAME",
+        help="store the members of the -e expression as snapshot NAME")
+    ap.add_argument("-d", "--diff", metavar="NAME",
+        help="compare the members of the -e expression to snapshot NAME")
     ap.add_argument("-q", "--quiet", action="store_true",
         help="do not print response from script")
     ap.add_argument("-c", "--config", action="append", metavar="EXPR",
@@ -147,6 +237,12 @@ lib/exec.js. See this module's docstring for an explanation of this syntax""")
     ag.add_argument("--dbus-path", metavar="PATH", default=BUS_PATH,
         help="message bus path (default: %(default)s)")
     args = ap.parse_args()
+    if args.snapshot is not None and args.diff is not None:
+        ap.error("--snapshot and --diff are mutually exclusive")
+    if args.snapshot is not None and args.expr is None:
+        ap.error("--snapshot requires -e,--expr")
+    if args.diff is not None and not os.path.exists(_snapshot_path(args.diff)):
+        ap.error("Snapshot {!r} not found in {}".format(args.diff, SNAPSHOT_DIR))
     if args.verbose:
         logger.setLevel(logging.DEBUG)
 
@@ -163,7 +259,8 @@ lib/exec.js. See this module's docstring for an explanation of this syntax""")
         for sfile in args.file:
             with open(sfile, "rt") as sfobj:
                 scripts.append(sfobj.read())
-    if args.expr is not None:
+    snapshot_mode = args.snapshot is not None or args.diff is not None
+    if args.expr is not None and not snapshot_mode:
         scripts.append(get_inspect_object_script(args.expr))
     if args.inspect_expr is not None:
         scripts.append(get_inspect_script(args.inspect_expr))
@@ -173,7 +270,7 @@ lib/exec.js. See this module's docstring for an explanation of this syntax""")
         scripts.append(get_list_script(args.list_expr))
     if args.run_expr:
         scripts.append(get_run_script(args.run_expr))
-    if len(scripts) == 0:
+    if len(scripts) == 0 and not snapshot_mode:
         ap.error("No scripts to run")
 
     # Determine what configuration (if any) we should include
@@ -189,7 +286,7 @@ lib/exec.js. See this module's docstring for an explanation of this syntax""")
             config[ckey] = cval
     logger.debug("Parsed configuration {}".format(config))
 
-    if args.all:
+    if args.all and len(scripts) > 0:
         scripts = ["\n".join(scripts)]
 
     # Execute the scripts
@@ -209,6 +306,11 @@ lib/exec.js. See this module's docstring for an explanation of this syntax""")
             logger.error("Error running script!")
             print(response)
 
+    if args.snapshot is not None:
+        run_snapshot(proxy, args.snapshot, args.expr, config, quiet=args.quiet)
+    if args.diff is not None:
+        run_diff(proxy, args.diff, args.expr, config, quiet=args.quiet)
+
 if __name__ == "__main__":
     main()
 